@@ -8,6 +8,7 @@ It utilizes 'StreamlitCallbackHandler' to visualize the agent's reasoning proces
 
 import sys
 import os
+import threading
 import streamlit as st
 from langchain_community.callbacks import StreamlitCallbackHandler
 
@@ -16,7 +17,9 @@ from langchain_community.callbacks import StreamlitCallbackHandler
 # This allows 'from src.agent import ...' to work even when running this script directly.
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.agent import initialize_agent
+from src.agent import MATH_ONLY_RE, initialize_agent
+from src.cache import DEFAULT_CACHE_PATH, PlanCache, PlanRecorder, SemanticCache
+from src.tools import TOOLS, calculator_tool
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -27,80 +30,20 @@ st.set_page_config(
 )
 
 # --- CUSTOM CSS (GEMINI/CHATGPT STYLE) ---
-st.markdown("""
-<style>
-    /* Remove excessive top padding */
-    .block-container {
-        padding-top: 2rem;
-        padding-bottom: 10rem;
-    }
-    
-    /* Hide default Streamlit menu, header, and footer for a cleaner look */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* Chat message styling */
-    .stChatMessage {
-        padding: 10px;
-        margin-bottom: 10px;
-    }
-    
-    /* --- INPUT BAR FINE-TUNING --- */
-    
-    /* Input Area (Textarea) */
-    div[data-testid="stChatInput"] textarea {
-        background-color: #2b2c2e !important;
-        color: #ffffff !important;
-        
-        /* Borders and Rounding */
-        border: 1px solid #444 !important;
-        border-radius: 30px !important;
-        
-        /* Internal Spacing */
-        padding-top: 13px !important; 
-        padding-bottom: 13px !important;
-        padding-left: 20px !important; 
-        padding-right: 20px !important;
-        
-        /* Dimensions */
-        min-height: 55px !important;
-        max-height: 200px !important; /* Limit max growth */
-        line-height: 1.5 !important;
-        
-        /* Enable Scroll */
-        overflow-y: auto !important;
-    }
-    
-    /* --- SCROLLBAR CUSTOMIZATION --- */
-    /* Thin, dark scrollbar to match the theme */
-    div[data-testid="stChatInput"] textarea::-webkit-scrollbar {
-        width: 8px;
-    }
-    div[data-testid="stChatInput"] textarea::-webkit-scrollbar-track {
-        background: transparent;
-    }
-    div[data-testid="stChatInput"] textarea::-webkit-scrollbar-thumb {
-        background-color: #555;
-        border-radius: 20px;
-    }
-    
-    /* Remove default blue border on focus */
-    div[data-testid="stChatInput"] textarea:focus {
-        border-color: #666 !important;
-        box-shadow: none !important;
-    }
-    
-    /* Send Button Icon */
-    div[data-testid="stChatInput"] button {
-        color: #cccccc !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Loaded from a static file and cached per session, so Streamlit reruns
+# (every widget interaction) skip the disk read and string rebuild.
+_CSS_PATH = os.path.join(os.path.dirname(__file__), "static", "chat.css")
+
+@st.cache_data
+def _load_css() -> str:
+    with open(_CSS_PATH, encoding="utf-8") as f:
+        return f.read()
+
+st.markdown(f"<style>{_load_css()}</style>", unsafe_allow_html=True)
 
 # --- HEADER ---
 st.markdown("<h1 style='text-align: center;'>✨ AI Assistant</h1>", unsafe_allow_html=True)
-st.markdown("<p style='text-align: center; color: gray; margin-bottom: 2rem;'>Powered by Llama 3.3 & Tavily Search</p>", unsafe_allow_html=True)
+st.markdown("<p style='text-align: center; color: gray; margin-bottom: 2rem;'>Powered by Llama 3.1 (3.3 fallback) & Tavily Search</p>", unsafe_allow_html=True)
 
 # --- STATE INITIALIZATION ---
 if "messages" not in st.session_state:
@@ -111,19 +54,101 @@ if "messages" not in st.session_state:
 def get_agent():
     return initialize_agent()
 
+@st.cache_resource
+def get_semantic_cache():
+    # Shared across reruns and persisted to disk: near-duplicates of past
+    # queries skip the agent, even across restarts.
+    return SemanticCache(get_agent(), path=DEFAULT_CACHE_PATH)
+
+@st.cache_resource
+def get_plan_cache():
+    # Shared across reruns: structurally similar queries replay recorded plans.
+    return PlanCache(TOOLS)
+
 try:
     agent = get_agent()
+    semantic_cache = get_semantic_cache()
+    plan_cache = get_plan_cache()
 except Exception as e:
     st.error(f"Failed to initialize agent. Check your .env file. Error: {e}")
     st.stop()
 
+# --- CONNECTION PRE-WARM ---
+def _prewarm():
+    """Fires a tiny dummy request so the TLS handshake to Groq (and any lazy
+    model warmup) is paid in the background, not by the first real user."""
+    try:
+        agent.invoke({"input": "hi"})
+    except Exception:
+        pass  # Best-effort: a failed warmup must never surface in the UI
+
+@st.cache_resource
+def _start_prewarm():
+    # cache_resource is process-wide, so the warmup fires exactly once per
+    # process — not once per browser session, which would cost a real LLM
+    # round-trip for every visitor.
+    threading.Thread(target=_prewarm, daemon=True).start()
+    return True
+
+_start_prewarm()
+
 # --- RENDER CHAT HISTORY ---
-for msg in st.session_state.messages:
-    avatar = "👤" if msg["role"] == "user" else "✨"
-    with st.chat_message(msg["role"], avatar=avatar):
-        st.markdown(msg["content"])
+@st.fragment
+def render_history():
+    """Renders past messages in its own fragment, so interactions elsewhere
+    on the page no longer re-execute this O(N) loop."""
+    for msg in st.session_state.messages:
+        avatar = "👤" if msg["role"] == "user" else "✨"
+        with st.chat_message(msg["role"], avatar=avatar):
+            st.markdown(msg["content"])
+
+render_history()
+
+
+# --- AGENT EXECUTION ---
+def run_agent(prompt: str) -> str:
+    """Runs the full ReAct loop on a cache miss and returns the final answer."""
+    # Create a status container to hide the "thinking" process
+    with st.status("🧠 Thinking...", expanded=False) as status:
+
+        # Initialize the LangChain Streamlit Callback
+        st_callback = StreamlitCallbackHandler(
+            st.container(),
+            expand_new_thoughts=False,
+            collapse_completed_thoughts=True
+        )
+
+        try:
+            # Stream the Agent instead of blocking on invoke().
+            # Each Thought/Action step is pushed to the callback as it
+            # happens, so the user sees progress at first-token time
+            # instead of waiting for the whole ReAct loop to finish.
+            output_text = ""
+            recorder = PlanRecorder()
+            for chunk in agent.stream(
+                {"input": prompt},
+                config={"callbacks": [st_callback, recorder]}
+            ):
+                if "output" in chunk:
+                    output_text += chunk["output"]
+
+            # Update status on success and cache both the answer (for
+            # near-duplicates) and the plan (for structural look-alikes)
+            status.update(label="Complete!", state="complete", expanded=False)
+            semantic_cache.update(prompt, output_text)
+            plan_cache.record(prompt, recorder.steps)
+
+        except Exception as e:
+            # Update status on error
+            status.update(label="Error!", state="error", expanded=True)
+            output_text = f"An error occurred: {str(e)}"
+
+    return output_text
 
 # --- USER INPUT ---
+# The chat input stays in the top-level script flow: wrapping it in a
+# fragment would give it an ancestor container, which demotes st.chat_input
+# from its pinned-bottom position to inline rendering.
 if prompt := st.chat_input("Type your message..."):
     # 1. Display User Message
     st.session_state.messages.append({"role": "user", "content": prompt})
@@ -132,34 +157,25 @@ if prompt := st.chat_input("Type your message..."):
 
     # 2. Generate Assistant Response
     with st.chat_message("assistant", avatar="✨"):
-        # Create a status container to hide the "thinking" process
-        with st.status("🧠 Thinking...", expanded=False) as status:
-            
-            # Initialize the LangChain Streamlit Callback
-            st_callback = StreamlitCallbackHandler(
-                st.container(),
-                expand_new_thoughts=False,
-                collapse_completed_thoughts=True
-            )
-            
-            try:
-                # Invoke the Agent
-                response = agent.invoke(
-                    {"input": prompt},
-                    config={"callbacks": [st_callback]}
-                )
-                
-                # Update status on success
-                status.update(label="Complete!", state="complete", expanded=False)
-                output_text = response["output"]
-                
-            except Exception as e:
-                # Update status on error
-                status.update(label="Error!", state="error", expanded=True)
-                output_text = f"An error occurred: {str(e)}"
+        # Fast path first: pure-math input ("2+2") goes straight to the
+        # calculator tool with no LLM involvement at all. Then the caches:
+        # a structural look-alike replays the recorded tool plan (with the
+        # numbers re-extracted, so it's checked first), and a near-duplicate
+        # of a past query returns its stored answer.
+        if MATH_ONLY_RE.match(prompt.strip()):
+            cached_output = calculator_tool.invoke(prompt.strip())
+        else:
+            cached_output = plan_cache.replay(prompt)
+            if cached_output is None:
+                cached_output = semantic_cache.lookup(prompt)
+
+        if cached_output is not None:
+            output_text = cached_output
+        else:
+            output_text = run_agent(prompt)
 
         # 3. Display Final Answer
         st.markdown(output_text)
-        
+
         # Save to History
-        st.session_state.messages.append({"role": "assistant", "content": output_text})
\ No newline at end of file
+        st.session_state.messages.append({"role": "assistant", "content": output_text})
@@ -0,0 +1,198 @@
+"""
+Cache Module
+
+This module provides a lightweight semantic cache for the agent. Queries that
+are near-duplicates of a previously answered query ("what is 2 + 2?" vs
+"what is 2+2") skip the full ReAct loop entirely and return the stored
+answer in microseconds instead of seconds.
+
+The embedding is deliberately dependency-free: queries are vectorized as
+bag-of-words term frequencies and compared with cosine similarity, which is
+a good fit for the short chat-style inputs this agent receives.
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Tokenizer for the bag-of-words embedding (lowercased word characters)
+_TOKEN_RE = re.compile(r"\w+")
+
+# Default on-disk location for the semantic cache, shared by the CLI and the
+# Streamlit app so answers survive restarts (file is gitignored).
+DEFAULT_CACHE_PATH = ".semantic_cache.json"
+
+def _vectorize(text: str) -> Counter:
+    """
+    Embeds a query as term frequencies over tokens AND token bigrams.
+
+    The bigrams make the vector order-sensitive: "is paris bigger than
+    london" and "is london bigger than paris" share every unigram, but
+    almost no bigrams, so rearrangements where word order carries meaning
+    no longer score cosine 1.0.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return Counter(tokens + bigrams)
+
+def _cosine(a: Counter, b: Counter) -> float:
+    """Computes cosine similarity between two sparse term-frequency vectors."""
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[token] for token, count in a.items())
+    norm = math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values()))
+    return dot / norm if norm else 0.0
+
+# AgentExecutor's forced-stop output; caching it would permanently serve a
+# failure message to every near-duplicate of the query.
+_STOPPED_OUTPUT = "Agent stopped due to iteration limit or time limit."
+
+class SemanticCache:
+    """
+    Wraps an AgentExecutor and short-circuits near-duplicate queries.
+
+    On invoke, the input is embedded and compared against every past query;
+    if the best cosine similarity reaches the threshold, the cached output is
+    returned without running the agent. Misses run the agent and store the
+    (query, output) pair. If a path is given, entries are persisted to a JSON
+    file so the cache survives restarts.
+
+    Queries containing a math expression are never cached or served: the
+    bag-of-words embedding ignores operators, so "12 + 4" and "12 - 4" would
+    collide and serve wrong arithmetic. Those queries belong to the
+    PlanCache, which re-extracts the numbers on every replay.
+    """
+
+    def __init__(self, executor, threshold: float = 0.95, path: str = None):
+        self.executor = executor
+        self.threshold = threshold
+        self._path = Path(path) if path else None
+        self._entries = []  # list of (vector, query, output) tuples
+        if self._path and self._path.exists():
+            self._load()
+
+    def lookup(self, query: str) -> str | None:
+        """Returns the cached output for a near-duplicate query, or None on miss."""
+        if _EXPRESSION_RE.search(query):
+            return None
+        vector = _vectorize(query)
+        best_score, best_output = 0.0, None
+        for entry_vector, _, output in self._entries:
+            score = _cosine(vector, entry_vector)
+            if score > best_score:
+                best_score, best_output = score, output
+        return best_output if best_score >= self.threshold else None
+
+    def update(self, query: str, output: str) -> None:
+        """Stores a completed (query, output) pair for future lookups."""
+        if _EXPRESSION_RE.search(query) or output == _STOPPED_OUTPUT:
+            return
+        self._entries.append((_vectorize(query), query, output))
+        if self._path:
+            self._save()
+
+    def invoke(self, inputs: dict, **kwargs) -> dict:
+        """Drop-in replacement for AgentExecutor.invoke with cache lookup."""
+        cached = self.lookup(inputs["input"])
+        if cached is not None:
+            return {"input": inputs["input"], "output": cached}
+        response = self.executor.invoke(inputs, **kwargs)
+        self.update(inputs["input"], response["output"])
+        return response
+
+    async def ainvoke(self, inputs: dict, **kwargs) -> dict:
+        """Async drop-in replacement for AgentExecutor.ainvoke with cache lookup."""
+        cached = self.lookup(inputs["input"])
+        if cached is not None:
+            return {"input": inputs["input"], "output": cached}
+        response = await self.executor.ainvoke(inputs, **kwargs)
+        self.update(inputs["input"], response["output"])
+        return response
+
+    def _load(self) -> None:
+        """Loads persisted (query, output) pairs; vectors are recomputed."""
+        try:
+            pairs = json.loads(self._path.read_text(encoding="utf-8"))
+            self._entries = [(_vectorize(q), q, o) for q, o in pairs]
+        except (ValueError, OSError):
+            # A corrupt or unreadable cache file is not fatal; start empty.
+            self._entries = []
+
+    def _save(self) -> None:
+        """Persists (query, output) pairs to disk as JSON."""
+        pairs = [[query, output] for _, query, output in self._entries]
+        self._path.write_text(json.dumps(pairs, ensure_ascii=False), encoding="utf-8")
+
+# --- Plan Caching ---
+
+# Matches a math expression embedded in a natural-language query,
+# e.g. "15 * 3" inside "what is 15 * 3?". A leading unary minus or bare
+# decimal point is part of the expression ("-5 + 3", ".5 * 2") — dropping
+# it would silently change the arithmetic.
+_EXPRESSION_RE = re.compile(r"[-.]?[\d(][\d\s+\-*/^().x]*[\d)]|[-.]?\d")
+
+# Tokens made purely of digits (the variable "slots" of a plan)
+_NUMERIC_RE = re.compile(r"^\d+$")
+
+def _plan_key(query: str) -> frozenset:
+    """
+    Keys a query by its non-numeric keywords, so structurally identical
+    questions ("what is 2 + 2" / "what is 15 * 3") share one plan.
+    """
+    return frozenset(
+        token for token in _TOKEN_RE.findall(query.lower())
+        if not _NUMERIC_RE.match(token)
+    )
+
+class PlanRecorder(BaseCallbackHandler):
+    """Collects the (tool, input) sequence of a run for the plan cache."""
+
+    def __init__(self):
+        self.steps = []
+
+    def on_agent_action(self, action, **kwargs) -> None:
+        self.steps.append((action.tool, str(action.tool_input)))
+
+class PlanCache:
+    """
+    Caches the tool-call plan of completed runs and replays it for
+    structurally similar queries, skipping the expensive LLM planning step.
+
+    Only single-step calculator plans are replayed: the math expression is
+    extracted from the new query by regex and fed straight to the tool, so
+    a hit costs one local tool call instead of two LLM round-trips. Every
+    other plan shape falls back to the full ReAct loop.
+    """
+
+    def __init__(self, tools):
+        self._tools = {t.name: t for t in tools}
+        self._plans = {}  # plan key -> list of (tool_name, tool_input)
+
+    def record(self, query: str, steps: list) -> None:
+        """Stores the (tool, input) sequence of a completed run."""
+        if steps:
+            self._plans[_plan_key(query)] = list(steps)
+
+    def replay(self, query: str) -> str | None:
+        """Replays a cached plan for a structurally similar query, or returns None."""
+        plan = self._plans.get(_plan_key(query))
+        if not plan or len(plan) != 1:
+            return None
+        tool_name, _ = plan[0]
+        if tool_name != "calculator_tool":
+            # Search results are time-sensitive; only the calculator
+            # plan is trivially templatable.
+            return None
+        match = _EXPRESSION_RE.search(query)
+        if not match:
+            return None
+        result = self._tools[tool_name].invoke(match.group().strip())
+        if result.startswith("Calculation error"):
+            # The extraction grabbed something the calculator can't evaluate;
+            # fall back to the full agent rather than serve an error.
+            return None
+        return result
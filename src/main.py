@@ -6,18 +6,53 @@ using the 'rich' library for formatted output. It allows users to interact
 with the agent directly from the terminal.
 """
 
+import asyncio
+
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.prompt import Prompt
-from src.agent import initialize_agent
+from src.agent import MATH_ONLY_RE, initialize_agent
+from src.cache import DEFAULT_CACHE_PATH, PlanCache, PlanRecorder, SemanticCache
+from src.tools import TOOLS, calculator_tool
 
 # Initialize the rich console for pretty printing
 console = Console()
 
-def main() -> None:
+async def stream_agent(agent, user_input: str, recorder: PlanRecorder) -> str:
+    """
+    Streams the agent into a live panel, so each Thought/Action step appears
+    as it happens instead of after the whole ReAct loop finishes.
+    """
+    output = ""
+    log = ""
+    with Live(console=console, refresh_per_second=8, transient=True) as live:
+        async for chunk in agent.astream(
+            {"input": user_input},
+            config={"callbacks": [recorder]}
+        ):
+            for action in chunk.get("actions", []):
+                log += action.log.strip() + "\n"
+            for step in chunk.get("steps", []):
+                log += f"Observation: {step.observation}\n"
+            if "output" in chunk:
+                output += chunk["output"]
+            if log:
+                live.update(Panel(
+                    log.strip(),
+                    title="[dim]🤖 Reasoning & Acting[/dim]",
+                    border_style="dim"
+                ))
+    return output or "No response generated."
+
+async def main() -> None:
     """
     Main loop for the CLI application.
     Initializes the agent and handles the user input/output loop.
+
+    Runs on an asyncio event loop so a slow LLM call no longer blocks the
+    process, and independent tool calls can be fanned out concurrently
+    (e.g., with asyncio.gather) as the agent grows.
     """
     # Application Header
     console.print(Panel.fit(
@@ -28,8 +63,12 @@ def main() -> None:
 
     # Agent Initialization
     try:
+        # The semantic cache answers near-duplicate questions instantly
+        # without re-running the ReAct loop, persisting entries between runs.
         agent = initialize_agent()
-        console.print("[green]✔ Agent initialized successfully! (Model: Llama-3.3 via Groq)[/green]\n")
+        semantic_cache = SemanticCache(agent, path=DEFAULT_CACHE_PATH)
+        plan_cache = PlanCache(TOOLS)
+        console.print("[green]✔ Agent initialized successfully! (Models: Llama-3.1-8B planner, Llama-3.3-70B fallback via Groq)[/green]\n")
     except Exception as e:
         console.print(f"[bold red]Initialization Error:[/bold red] {e}")
         return
@@ -38,7 +77,9 @@ def main() -> None:
 
     # Interaction Loop
     while True:
-        user_input = Prompt.ask("[bold cyan]You[/bold cyan]")
+        # Rich's prompt is blocking, so run it in a worker thread
+        # to keep the event loop responsive.
+        user_input = await asyncio.to_thread(Prompt.ask, "[bold cyan]You[/bold cyan]")
 
         # Exit conditions
         if user_input.lower() in ["exit", "quit", "bye"]:
@@ -49,14 +90,25 @@ def main() -> None:
         if not user_input.strip():
             continue
 
-        console.print("\n[dim]🤖 Thinking... (Reasoning & Acting)[/dim]")
-        
         try:
-            # Invoking the agent
-            response = agent.invoke({"input": user_input})
-            
-            # Extract output safely
-            output = response.get("output", "No response generated.")
+            # Fast path: pure-math input ("2+2") goes straight to the
+            # calculator tool with no LLM involvement at all.
+            if MATH_ONLY_RE.match(user_input.strip()):
+                output = calculator_tool.invoke(user_input.strip())
+            else:
+                # Plan cache: structurally similar questions replay the recorded
+                # tool calls directly, skipping the LLM planning step. Then a
+                # near-duplicate of a past question returns its stored answer.
+                output = plan_cache.replay(user_input)
+                if output is None:
+                    output = semantic_cache.lookup(user_input)
+
+            if output is None:
+                # Streaming the agent, recording its plan for future replays
+                recorder = PlanRecorder()
+                output = await stream_agent(agent, user_input, recorder)
+                plan_cache.record(user_input, recorder.steps)
+                semantic_cache.update(user_input, output)
             
             # Pretty print the final response
             console.print(Panel(
@@ -70,4 +122,4 @@ def main() -> None:
             console.print(f"[bold red]Execution Error:[/bold red] {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -5,30 +5,45 @@ This module defines the specific tools that the AI Agent can access.
 It currently includes:
 1. Calculator: For safe mathematical evaluations.
 2. Tavily Search: For real-time web information retrieval.
+
+Heavy dependencies (numexpr, langchain_tavily) are imported lazily so that
+calculator-only callers — the test suite, the pure-math fast path — don't
+pay for the Tavily import chain at module load.
 """
 
-import numexpr
+import functools
 import os
+import re
 from dotenv import load_dotenv
 from langchain.tools import tool
-from langchain_tavily import TavilySearch
 
 # Load environment variables immediately to ensure API keys are available
 load_dotenv()
 
-# Validate Tavily API Key
-if not os.getenv("TAVILY_API_KEY"):
-    raise ValueError(
-        "TAVILY_API_KEY not found in .env file. "
-        "Please ensure you have a .env file in the root directory with TAVILY_API_KEY=tvly-..."
-    )
+# Sanitization helpers, compiled/built once at import.
+# The tool sits on the hot ReAct path, so per-call string scans are kept to
+# a single regex pass plus one translate (no intermediate replace() strings).
+_CARET_RE = re.compile(r"\^")
+_CALC_TRANS = str.maketrans({"x": "*"})
+
+# Expressions longer than this bypass both caches, so pathological inputs
+# can't bloat them with huge keys.
+_MAX_CACHED_LEN = 256
+
+@functools.lru_cache(maxsize=1024)
+def _compile(safe_expression: str):
+    """Parses and JIT-compiles an expression once; the NumExpr object is reusable."""
+    # Deferred import: numexpr is only loaded when something actually evaluates
+    import numexpr
 
-# Initialize the Tavily Search Tool
-try:
-    # Using the correct class from the new 'langchain_tavily' package
-    tavily_tool = TavilySearch(max_results=3)
-except Exception as e:
-    raise ValueError(f"Failed to initialize Tavily tool: {e}")
+    # Compiling instead of eval()-style strings keeps this safe AND puts
+    # repeat evaluations entirely in numexpr's C fast path.
+    return numexpr.NumExpr(safe_expression)
+
+@functools.lru_cache(maxsize=512)
+def _evaluate(safe_expression: str) -> str:
+    """Evaluate a sanitized expression, caching results for repeated sub-expressions."""
+    return str(_compile(safe_expression)().item())
 
 @tool
 def calculator_tool(expression: str) -> str:
@@ -38,15 +53,48 @@ def calculator_tool(expression: str) -> str:
     The input must be a pure mathematical expression, e.g., "128 * 46" or "20 + 5 / 2".
     """
     try:
-        # Basic sanitization to prevent syntax errors
-        safe_expression = expression.replace('^', '**').replace('x', '*')
-        
-        # Evaluate safely using numexpr (avoids eval() security risks)
-        result = numexpr.evaluate(safe_expression)
-        return str(result.item())
-        
+        # Basic sanitization to prevent syntax errors ('^' -> '**', 'x' -> '*')
+        safe_expression = _CARET_RE.sub("**", expression).translate(_CALC_TRANS)
+
+        if len(safe_expression) > _MAX_CACHED_LEN:
+            # Oversized input: evaluate directly without touching the caches
+            import numexpr
+            return str(numexpr.evaluate(safe_expression).item())
+
+        return _evaluate(safe_expression)
+
     except Exception as e:
         return f"Calculation error: {str(e)}"
 
-# Export the list of available tools
-TOOLS = [calculator_tool, tavily_tool]
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def _init_search_tool():
+    """Builds the Tavily search tool on first use (deferred heavy import)."""
+    from langchain_tavily import TavilySearch
+
+    # Validate Tavily API Key
+    if not os.getenv("TAVILY_API_KEY"):
+        raise ValueError(
+            "TAVILY_API_KEY not found in .env file. "
+            "Please ensure you have a .env file in the root directory with TAVILY_API_KEY=tvly-..."
+        )
+
+    try:
+        # Using the correct class from the new 'langchain_tavily' package
+        return TavilySearch(max_results=3)
+    except Exception as e:
+        raise ValueError(f"Failed to initialize Tavily tool: {e}")
+
+def __getattr__(name):
+    # PEP 562 lazy attributes: the Tavily client (and the TOOLS list built on
+    # top of it) is only constructed when something actually asks for it.
+    if name == "tavily_tool":
+        tavily_tool = _init_search_tool()
+        globals()["tavily_tool"] = tavily_tool
+        return tavily_tool
+    if name == "TOOLS":
+        # Sorted by name so the rendered tool block in the prompt is byte-identical
+        # across runs, keeping the static prompt prefix stable for provider-side caching.
+        TOOLS = sorted([calculator_tool, _init_search_tool()], key=lambda t: t.name)
+        globals()["TOOLS"] = TOOLS
+        return TOOLS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,10 +5,18 @@ This module tests the agent initialization process, environment validation,
 and static analysis of the System Prompt (Prompt Engineering).
 """
 
+import asyncio
 import os
 import pytest
 from unittest.mock import patch, MagicMock
-from src.agent import initialize_agent
+from src.agent import BatchedAgent, MATH_ONLY_RE, initialize_agent, _build_agent
+
+@pytest.fixture(autouse=True)
+def fresh_agent_cache():
+    """Clear the memoized agent builder so every test exercises construction."""
+    _build_agent.cache_clear()
+    yield
+    _build_agent.cache_clear()
 
 def test_initialize_agent_missing_api_key():
     """Test if ValueError is raised when GROQ_API_KEY is missing from environment."""
@@ -25,9 +33,10 @@ def test_initialize_agent_success(mock_executor, mock_create_agent, mock_llm):
     with patch.dict(os.environ, {"GROQ_API_KEY": "fake_key_123"}):
         executor = initialize_agent()
         
-        # 1. Verify LLM Initialization
-        mock_llm.assert_called_once()
-        assert mock_llm.call_args[1]["model_name"] == "llama-3.3-70b-versatile"
+        # 1. Verify LLM Initialization (fast planner tier + strong fallback)
+        assert mock_llm.call_count == 2
+        model_names = [call[1]["model_name"] for call in mock_llm.call_args_list]
+        assert model_names == ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
         
         # 2. Verify Agent Creation
         mock_create_agent.assert_called_once()
@@ -64,4 +73,111 @@ def test_agent_prompt_engineering(mock_executor, mock_create_agent, mock_llm):
         
         # --- Tool Definition Checks ---
         assert "calculator_tool" in template_text
-        assert "tavily_search" in template_text
\ No newline at end of file
+        assert "tavily_search" in template_text
+
+# --- Math Fast-Path Routing Tests ---
+
+def test_math_only_regex_matches_pure_math():
+    """Pure-math prompts must qualify for the no-LLM fast path."""
+    assert MATH_ONLY_RE.match("2+2")
+    assert MATH_ONLY_RE.match("10 x 5")
+    assert MATH_ONLY_RE.match("(2 + 2) * 10")
+    assert MATH_ONLY_RE.match("2^3")
+
+def test_math_only_regex_rejects_natural_language():
+    """Anything with words (or no digits) must go through the agent."""
+    assert not MATH_ONLY_RE.match("what is 2+2")
+    assert not MATH_ONLY_RE.match("hello")
+    assert not MATH_ONLY_RE.match("x")
+    assert not MATH_ONLY_RE.match("")
+
+# --- Micro-Batching Tests ---
+
+def test_batched_agent_coalesces_concurrent_requests():
+    """Concurrent requests inside the window must share one abatch call."""
+    batch_calls = []
+
+    class FakeExecutor:
+        async def abatch(self, inputs, config=None):
+            batch_calls.append(inputs)
+            return [{"output": item["input"].upper()} for item in inputs]
+
+    async def scenario():
+        batched = BatchedAgent(FakeExecutor(), batch_window_ms=50)
+        return await asyncio.gather(
+            batched.ainvoke({"input": "a"}),
+            batched.ainvoke({"input": "b"}),
+            batched.ainvoke({"input": "c"}),
+        )
+
+    results = asyncio.run(scenario())
+
+    assert [r["output"] for r in results] == ["A", "B", "C"]
+    assert len(batch_calls) == 1  # all three coalesced into a single batch
+
+def test_batched_agent_survives_event_loop_change():
+    """Reusing one instance across asyncio.run loops must not deadlock."""
+
+    class FakeExecutor:
+        async def abatch(self, inputs, config=None):
+            return [{"output": item["input"]} for item in inputs]
+
+    batched = BatchedAgent(FakeExecutor())
+    first = asyncio.run(batched.ainvoke({"input": "a"}))
+    second = asyncio.run(batched.ainvoke({"input": "b"}))
+
+    assert first["output"] == "a"
+    assert second["output"] == "b"
+
+def test_batched_agent_fails_futures_on_executor_error():
+    """An executor failure must surface to the caller, not hang it."""
+
+    class BrokenExecutor:
+        async def abatch(self, inputs, config=None):
+            raise RuntimeError("boom")
+
+    batched = BatchedAgent(BrokenExecutor())
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(batched.ainvoke({"input": "a"}))
+
+# --- Parsing Repair Tests ---
+
+def test_repair_extracts_final_answer():
+    """A parse failure that already contains a Final Answer must be salvaged locally."""
+    from langchain_core.exceptions import OutputParserException
+    from src.agent import _repair_parsing_error
+
+    error = OutputParserException(
+        "bad output",
+        llm_output="Thought: easy\nAction: None\nFinal Answer: The result is 4",
+    )
+    assert "The result is 4" in _repair_parsing_error(error)
+
+def test_repair_falls_back_to_format_reminder():
+    """Without a Final Answer, the repair must nudge the model back on format."""
+    from langchain_core.exceptions import OutputParserException
+    from src.agent import _repair_parsing_error
+
+    error = OutputParserException("bad output", llm_output="complete gibberish")
+    assert "Final Answer" in _repair_parsing_error(error)
+
+# --- Scratchpad Trimming Tests ---
+
+def test_trim_keeps_recent_observations_verbatim():
+    """The last two observations must never be truncated."""
+    from src.agent import _trim_steps
+
+    long_obs = "z" * 2000
+    steps = [("a1", long_obs), ("a2", long_obs), ("a3", long_obs)]
+    trimmed = _trim_steps(steps)
+
+    assert trimmed[0][1].endswith("…[truncated]")
+    assert trimmed[1][1] == long_obs
+    assert trimmed[2][1] == long_obs
+
+def test_trim_leaves_short_observations_alone():
+    """Short observations pass through untouched regardless of age."""
+    from src.agent import _trim_steps
+
+    steps = [("a1", "4"), ("a2", "40"), ("a3", "400")]
+    assert _trim_steps(steps) == steps
@@ -0,0 +1,148 @@
+"""
+Unit Tests for the Semantic Cache
+
+This module validates the semantic cache that short-circuits the agent
+for near-duplicate queries (lookup, update, invoke wrapping, persistence).
+"""
+
+import pytest
+from unittest.mock import MagicMock
+from src.cache import PlanCache, SemanticCache
+from src.tools import calculator_tool
+
+def make_executor(output="4"):
+    """Builds a fake AgentExecutor returning a fixed output."""
+    executor = MagicMock()
+    executor.invoke.return_value = {"input": "", "output": output}
+    return executor
+
+# --- Lookup / Update Tests ---
+
+def test_lookup_miss_on_empty_cache():
+    """A fresh cache must return None for any query."""
+    cache = SemanticCache(make_executor())
+    assert cache.lookup("what is the capital of france") is None
+
+def test_lookup_hit_on_identical_query():
+    """An identical query must hit after an update."""
+    cache = SemanticCache(make_executor())
+    cache.update("what is the capital of france", "Paris")
+    assert cache.lookup("what is the capital of france") == "Paris"
+
+def test_lookup_hit_on_near_duplicate():
+    """Token-identical rephrasings (punctuation/casing) must hit."""
+    cache = SemanticCache(make_executor())
+    cache.update("What is the capital of France?", "Paris")
+    assert cache.lookup("what is the capital of france") == "Paris"
+
+def test_lookup_miss_on_unrelated_query():
+    """Semantically unrelated queries must not hit."""
+    cache = SemanticCache(make_executor())
+    cache.update("what is the capital of france", "Paris")
+    assert cache.lookup("current bitcoin price") is None
+
+def test_lookup_miss_on_word_order_change():
+    """
+    Rearrangements where word order carries meaning must not hit: bag-of-words
+    alone scores "is london bigger than paris" identical to its reverse.
+    """
+    cache = SemanticCache(make_executor())
+    cache.update("is paris bigger than london", "Yes")
+    assert cache.lookup("is london bigger than paris") is None
+
+def test_math_queries_bypass_the_cache():
+    """
+    Queries containing math expressions must never be cached or served:
+    the bag-of-words embedding ignores operators, so "12 + 4" and "12 - 4"
+    would collide and serve wrong arithmetic.
+    """
+    cache = SemanticCache(make_executor())
+    cache.update("what is 12 + 4", "16")
+    assert cache.lookup("what is 12 + 4") is None
+    assert cache.lookup("what is 12 - 4") is None
+    assert cache.lookup("what is 2 + 2 + 2") is None
+
+def test_stopped_output_is_never_cached():
+    """The executor's forced-stop message must not be stored as an answer."""
+    cache = SemanticCache(make_executor())
+    cache.update("tell me a story", "Agent stopped due to iteration limit or time limit.")
+    assert cache.lookup("tell me a story") is None
+
+# --- Invoke Wrapping Tests ---
+
+def test_invoke_runs_agent_once_for_duplicates():
+    """The wrapped executor must only run on cache misses."""
+    executor = make_executor("Paris")
+    cache = SemanticCache(executor)
+
+    first = cache.invoke({"input": "what is the capital of france"})
+    second = cache.invoke({"input": "what is the capital of france"})
+
+    assert first["output"] == "Paris"
+    assert second["output"] == "Paris"
+    executor.invoke.assert_called_once()
+
+# --- Persistence Tests ---
+
+def test_cache_persists_between_instances(tmp_path):
+    """Entries written by one instance must be visible to the next."""
+    path = tmp_path / "semantic_cache.json"
+    cache = SemanticCache(make_executor(), path=str(path))
+    cache.update("what is the capital of france", "Paris")
+
+    reloaded = SemanticCache(make_executor(), path=str(path))
+    assert reloaded.lookup("what is the capital of france") == "Paris"
+
+def test_cache_survives_corrupt_file(tmp_path):
+    """A corrupt cache file must not crash initialization."""
+    path = tmp_path / "semantic_cache.json"
+    path.write_text("not json at all")
+    cache = SemanticCache(make_executor(), path=str(path))
+    assert cache.lookup("anything") is None
+
+# --- Plan Cache Tests ---
+
+def test_plan_replay_for_structurally_similar_query():
+    """A recorded calculator plan must replay with fresh numbers."""
+    cache = PlanCache([calculator_tool])
+    cache.record("what is 2 + 2", [("calculator_tool", "2 + 2")])
+
+    # Same structure, different numbers: replay the tool, skip the LLM
+    assert cache.replay("what is 15 * 3") == "45"
+
+def test_plan_replay_preserves_unary_minus_and_decimal_point():
+    """A leading '-' or '.' is part of the expression and must not be dropped."""
+    cache = PlanCache([calculator_tool])
+    cache.record("what is 2 + 2", [("calculator_tool", "2 + 2")])
+
+    assert cache.replay("what is -5 + 3") == "-2"
+    assert cache.replay("what is .5 * 2") == "1.0"
+
+def test_plan_replay_refuses_unevaluable_extraction():
+    """An extraction the calculator rejects must fall back to the agent."""
+    cache = PlanCache([calculator_tool])
+    cache.record("what is 2 + 2", [("calculator_tool", "2 + 2")])
+
+    # Same plan key, but the extracted "expression" is invalid syntax
+    assert cache.replay("what is 5..2") is None
+
+def test_plan_replay_miss_on_unknown_structure():
+    """Queries with no recorded plan must fall back to the agent."""
+    cache = PlanCache([calculator_tool])
+    cache.record("what is 2 + 2", [("calculator_tool", "2 + 2")])
+    assert cache.replay("who won the world cup") is None
+
+def test_plan_replay_skips_multi_step_plans():
+    """Only trivially templatable single-step plans are replayed."""
+    cache = PlanCache([calculator_tool])
+    cache.record(
+        "price of bitcoin times 2",
+        [("tavily_search", "bitcoin price"), ("calculator_tool", "100000 * 2")],
+    )
+    assert cache.replay("price of bitcoin times 5") is None
+
+def test_plan_replay_skips_search_plans():
+    """Search results are time-sensitive and must never be replayed."""
+    cache = PlanCache([calculator_tool])
+    cache.record("latest ai news", [("tavily_search", "latest ai news")])
+    assert cache.replay("latest ai news") is None